@@ -3,14 +3,39 @@ Passcode - Challenge-response OTP library using SHA3-KMAC and BLAKE3
 """
 
 try:
-    from .passcode import Algorithm, Passcode, blake3_keyed_mode_128, blake3_keyed_mode_256, sha3_kmac_128, sha3_kmac_256
-except Exception:
-    # Fallback to Node.js bridge if wasmtime is not available
-    from .passcode_nodejs_bridge import Algorithm, Passcode
-    blake3_keyed_mode_128 = None
-    blake3_keyed_mode_256 = None
-    sha3_kmac_128 = None
-    sha3_kmac_256 = None
+    # Prefer the native Rust library when it has been built into the package
+    from ._native import Algorithm, Passcode
+except (ImportError, OSError):
+    try:
+        from .passcode import Algorithm, Passcode
+    except Exception:
+        # Fallback to Node.js bridge if wasmtime is not available
+        from .passcode_nodejs_bridge import Algorithm, Passcode
+
+# Provided by the wasmtime module; loaded on first access so importing the
+# package does not compile and instantiate WASM when Passcode is native
+_WASM_HELPERS = (
+    "blake3_keyed_mode_128",
+    "blake3_keyed_mode_256",
+    "make_runtime",
+    "release_thread_runtime",
+    "sha3_kmac_128",
+    "sha3_kmac_256",
+)
+
+
+def __getattr__(name):
+    if name in _WASM_HELPERS:
+        try:
+            from . import passcode
+        except Exception:
+            value = None
+        else:
+            value = getattr(passcode, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "1.0.0"
 __all__ = [
@@ -18,6 +43,8 @@ __all__ = [
     "Passcode",
     "blake3_keyed_mode_128",
     "blake3_keyed_mode_256",
+    "make_runtime",
+    "release_thread_runtime",
     "sha3_kmac_128",
     "sha3_kmac_256",
 ]
@@ -0,0 +1,180 @@
+"""
+Keccak-f[1600] and KMAC (NIST SP 800-185) compiled with Numba
+
+Used as an in-process fallback when neither the native library nor
+wasmtime is available. Requires numpy and numba.
+"""
+
+import numpy as np
+from numba import njit
+
+
+# Rate in bytes for KMAC128 / KMAC256
+_RATE_128 = 168
+_RATE_256 = 136
+
+_ROUND_CONSTANTS = np.array([
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+], dtype=np.uint64)
+
+# Rotation offsets indexed by lane x + 5 * y
+_ROTATIONS = np.array([
+    0, 1, 62, 28, 27,
+    36, 44, 6, 55, 20,
+    3, 10, 43, 25, 39,
+    41, 45, 15, 21, 8,
+    18, 2, 61, 56, 14,
+], dtype=np.uint64)
+
+
+@njit(cache=True, boundscheck=False)
+def _rotl(value, shift):
+    if shift == 0:
+        return value
+    return (value << shift) | (value >> (np.uint64(64) - shift))
+
+
+@njit(cache=True, boundscheck=False)
+def keccak_f1600(state):
+    """Apply the 24-round Keccak-f[1600] permutation to a uint64[25] state in place"""
+    c = np.empty(5, dtype=np.uint64)
+    b = np.empty(25, dtype=np.uint64)
+    for rnd in range(24):
+        # theta
+        for x in range(5):
+            c[x] = state[x] ^ state[x + 5] ^ state[x + 10] ^ state[x + 15] ^ state[x + 20]
+        for x in range(5):
+            d = c[(x + 4) % 5] ^ _rotl(c[(x + 1) % 5], np.uint64(1))
+            for y in range(0, 25, 5):
+                state[y + x] ^= d
+
+        # rho and pi
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotl(state[x + 5 * y], _ROTATIONS[x + 5 * y])
+
+        # chi
+        for y in range(0, 25, 5):
+            for x in range(5):
+                state[y + x] = b[y + x] ^ (~b[y + (x + 1) % 5] & b[y + (x + 2) % 5])
+
+        # iota
+        state[0] ^= _ROUND_CONSTANTS[rnd]
+
+
+@njit(cache=True, boundscheck=False)
+def _absorb(state, message, rate):
+    """XOR `message` (a whole number of `rate`-byte blocks) into the state"""
+    lanes = rate // 8
+    for offset in range(0, message.shape[0], rate):
+        for i in range(lanes):
+            lane = np.uint64(0)
+            for k in range(8):
+                lane |= np.uint64(message[offset + 8 * i + k]) << np.uint64(8 * k)
+            state[i] ^= lane
+        keccak_f1600(state)
+
+
+@njit(cache=True, boundscheck=False)
+def _cshake_from(initial, message, rate, out_len):
+    """Absorb `message` with cSHAKE padding on top of `initial` and squeeze `out_len` bytes"""
+    length = message.shape[0]
+    padded_len = (length // rate + 1) * rate
+    padded = np.zeros(padded_len, dtype=np.uint8)
+    padded[:length] = message
+    padded[length] ^= 0x04
+    padded[padded_len - 1] ^= 0x80
+
+    state = initial.copy()
+    _absorb(state, padded, rate)
+
+    lanes = rate // 8
+    out = np.empty(out_len, dtype=np.uint8)
+    pos = 0
+    while True:
+        for i in range(lanes):
+            lane = state[i]
+            for k in range(8):
+                if pos == out_len:
+                    return out
+                out[pos] = np.uint8((lane >> np.uint64(8 * k)) & np.uint64(0xFF))
+                pos += 1
+        keccak_f1600(state)
+
+
+def _cshake(message, rate, out_len):
+    """Absorb `message` with cSHAKE padding and squeeze `out_len` bytes"""
+    return _cshake_from(np.zeros(25, dtype=np.uint64), message, rate, out_len)
+
+
+def _left_encode(value: int) -> bytes:
+    n = max(1, (value.bit_length() + 7) // 8)
+    return bytes([n]) + value.to_bytes(n, 'big')
+
+
+def _right_encode(value: int) -> bytes:
+    n = max(1, (value.bit_length() + 7) // 8)
+    return value.to_bytes(n, 'big') + bytes([n])
+
+
+def _encode_string(data: bytes) -> bytes:
+    return _left_encode(len(data) * 8) + data
+
+
+def _bytepad(data: bytes, w: int) -> bytes:
+    padded = _left_encode(w) + data
+    return padded + b"\x00" * (-len(padded) % w)
+
+
+def _kmac_prefix(key: bytes, customization: bytes, rate: int) -> bytes:
+    return (
+        _bytepad(_encode_string(b"KMAC") + _encode_string(customization), rate)
+        + _bytepad(_encode_string(key), rate)
+    )
+
+
+def _kmac(key: bytes, customization: bytes, data: bytes, output_len: int, rate: int) -> bytes:
+    message = b"".join((
+        _kmac_prefix(key, customization, rate),
+        data,
+        _right_encode(output_len * 8),
+    ))
+    return _cshake(np.frombuffer(message, dtype=np.uint8), rate, output_len).tobytes()
+
+
+def _kmac_keyed(key: bytes, customization: bytes, output_len: int, rate: int):
+    # The prefix is whole blocks, so its permutations run once here and
+    # each call only absorbs the data and the encoded output length
+    state = np.zeros(25, dtype=np.uint64)
+    _absorb(state, np.frombuffer(_kmac_prefix(key, customization, rate), dtype=np.uint8), rate)
+    suffix = _right_encode(output_len * 8)
+
+    def compute(data: bytes) -> bytes:
+        message = np.frombuffer(bytes(data) + suffix, dtype=np.uint8)
+        return _cshake_from(state, message, rate, output_len).tobytes()
+    return compute
+
+
+def kmac128(key: bytes, customization: bytes, data: bytes, output_len: int) -> bytes:
+    """Compute KMAC128 with an `output_len`-byte output"""
+    return _kmac(key, customization, data, output_len, _RATE_128)
+
+
+def kmac256(key: bytes, customization: bytes, data: bytes, output_len: int) -> bytes:
+    """Compute KMAC256 with an `output_len`-byte output"""
+    return _kmac(key, customization, data, output_len, _RATE_256)
+
+
+def kmac128_keyed(key: bytes, customization: bytes, output_len: int):
+    """Return a function computing KMAC128 of its data under a fixed key and customization"""
+    return _kmac_keyed(key, customization, output_len, _RATE_128)
+
+
+def kmac256_keyed(key: bytes, customization: bytes, output_len: int):
+    """Return a function computing KMAC256 of its data under a fixed key and customization"""
+    return _kmac_keyed(key, customization, output_len, _RATE_256)
@@ -0,0 +1,175 @@
+"""
+Python wrapper for the native Passcode library (ports/rust) using ctypes
+"""
+
+import ctypes
+import os
+import sys
+from enum import IntEnum
+from pathlib import Path
+
+
+class Algorithm(IntEnum):
+    """Supported hash algorithms"""
+    SHA3_KMAC_128 = 0
+    SHA3_KMAC_256 = 1
+    BLAKE3_KEYED_MODE_128 = 2
+    BLAKE3_KEYED_MODE_256 = 3
+
+
+_ALGORITHM_NAMES = {
+    Algorithm.SHA3_KMAC_128: "SHA3-KMAC-128",
+    Algorithm.SHA3_KMAC_256: "SHA3-KMAC-256",
+    Algorithm.BLAKE3_KEYED_MODE_128: "BLAKE3-Keyed-Mode-128",
+    Algorithm.BLAKE3_KEYED_MODE_256: "BLAKE3-Keyed-Mode-256",
+}
+
+
+# Length of an OTP in hex characters
+_OTP_LEN = 12
+
+# OTP plus the NUL terminator written by passcode_compute
+_OUT_LEN = _OTP_LEN + 1
+
+
+def _library_path() -> Path:
+    """Locate the native library, honouring PASSCODE_NATIVE_LIB"""
+    override = os.environ.get("PASSCODE_NATIVE_LIB")
+    if override:
+        return Path(override)
+
+    if sys.platform == "win32":
+        name = "passcode.dll"
+    elif sys.platform == "darwin":
+        name = "libpasscode.dylib"
+    else:
+        name = "libpasscode.so"
+    return Path(__file__).parent / name
+
+
+_path = _library_path()
+if not _path.exists():
+    raise ImportError(f"native passcode library not found: {_path}")
+
+_lib = ctypes.CDLL(str(_path))
+
+# A library built from an older ports/rust lets the package fall back
+for _name in ("passcode_new", "passcode_compute", "passcode_compute_many", "passcode_free"):
+    if not hasattr(_lib, _name):
+        raise ImportError(f"native passcode library is missing {_name}; rebuild ports/rust")
+
+_lib.passcode_new.argtypes = [ctypes.c_uint8, ctypes.c_char_p, ctypes.c_size_t]
+_lib.passcode_new.restype = ctypes.c_void_p
+
+_lib.passcode_compute.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_char_p, ctypes.c_size_t,
+    ctypes.c_char_p, ctypes.c_size_t,
+]
+_lib.passcode_compute.restype = ctypes.c_int32
+
+_lib.passcode_compute_many.argtypes = [
+    ctypes.c_void_p,
+    ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t), ctypes.c_size_t,
+    ctypes.c_char_p, ctypes.c_size_t,
+]
+_lib.passcode_compute_many.restype = ctypes.c_int32
+
+_lib.passcode_free.argtypes = [ctypes.c_void_p]
+_lib.passcode_free.restype = None
+
+
+class Passcode:
+    """Challenge-response OTP generator"""
+
+    def __init__(self, algorithm: Algorithm, key: bytes):
+        """
+        Create a new Passcode instance
+
+        Args:
+            algorithm: Algorithm to use (Algorithm enum)
+            key: Secret key (bytes, 32 bytes recommended)
+        """
+        if not isinstance(key, bytes):
+            raise TypeError("key must be bytes")
+
+        # passcode_new takes the algorithm as a u8, so out-of-range values
+        # would be truncated into a valid one; reject them here instead
+        if algorithm not in _ALGORITHM_NAMES:
+            raise ValueError(f"unsupported algorithm: {algorithm}")
+
+        self.algorithm = algorithm
+        self.key = key
+
+        # Create instance in the native library
+        self._handle = _lib.passcode_new(int(algorithm), key, len(key))
+        if not self._handle:
+            raise ValueError(f"unsupported algorithm: {algorithm}")
+
+    def __del__(self):
+        handle = getattr(self, "_handle", None)
+        if handle:
+            _lib.passcode_free(handle)
+            self._handle = None
+
+    def compute(self, data: bytes) -> str:
+        """
+        Compute OTP from challenge data
+
+        Args:
+            data: Challenge data (bytes-like)
+
+        Returns:
+            12-character hexadecimal OTP string
+        """
+        return self.compute_bytes(data).decode('ascii')
+
+    def compute_bytes(self, data: bytes) -> bytes:
+        """
+        Compute OTP from challenge data without decoding it
+
+        Args:
+            data: Challenge data (bytes-like)
+
+        Returns:
+            12-character hexadecimal OTP as ASCII bytes
+        """
+        if type(data) is not bytes:
+            data = memoryview(data).tobytes()
+
+        out = ctypes.create_string_buffer(_OUT_LEN)
+        written = _lib.passcode_compute(self._handle, data, len(data), out, _OUT_LEN)
+        if written < 0:
+            raise RuntimeError(f"passcode_compute failed with code {written}")
+        return out.raw[:written]
+
+    def compute_many(self, challenges: list[bytes]) -> list[str]:
+        """
+        Compute OTPs for a batch of challenges in a single native call
+
+        Args:
+            challenges: Challenge data for each OTP (list of bytes-like)
+
+        Returns:
+            List of 12-character hexadecimal OTP strings, in order
+        """
+        challenges = [c if type(c) is bytes else memoryview(c).tobytes() for c in challenges]
+
+        count = len(challenges)
+        if count == 0:
+            return []
+
+        data = b"".join(challenges)
+        lens = (ctypes.c_size_t * count)(*map(len, challenges))
+        out_len = count * _OTP_LEN
+        out = ctypes.create_string_buffer(out_len)
+        written = _lib.passcode_compute_many(self._handle, data, lens, count, out, out_len)
+        if written < 0:
+            raise RuntimeError(f"passcode_compute_many failed with code {written}")
+
+        otps = out.raw.decode('ascii')
+        return [otps[i:i + _OTP_LEN] for i in range(0, out_len, _OTP_LEN)]
+
+    def algorithm_name(self) -> str:
+        """Get the name of the algorithm"""
+        return _ALGORITHM_NAMES.get(self.algorithm, "Unknown")
@@ -2,9 +2,38 @@
 Python wrapper for Passcode WASM library using wasmtime
 """
 
+import ctypes
+import hashlib
+import os
+import platform
+import struct
+import sys
+import threading
+from functools import lru_cache
 from enum import IntEnum
+from importlib.metadata import version
 from pathlib import Path
-from wasmtime import Store, Module, Instance, Linker, WasiConfig
+from wasmtime import Config, Engine, Store, Module, Linker, WasmtimeError
+
+
+# WebAssembly module shipped with the package
+_WASM_PATH = Path(__file__).parent / "passcode_wasm_bg.wasm"
+
+# Import module of the JS glue that wasm-bindgen generates alongside the .wasm
+_GLUE_MODULE = "./passcode_wasm_bg.js"
+
+# Output length, in bytes, of sha3_kmac_128/256 (same as the OTP path)
+_KMAC_OUTPUT_LEN = 32
+
+# Heap size the guest allocator is warmed up to at construction (4 MiB)
+HEAP_RESERVE = 4 * 1024 * 1024
+
+# wasm-bindgen string header: (data_ptr, length), both i32 little endian
+_HDR = struct.Struct("<II")
+
+# wasm-bindgen Result<T, JsValue> written through the return pointer:
+# (value, error, is_error), all i32 little endian
+_RESULT = struct.Struct("<III")
 
 
 class Algorithm(IntEnum):
@@ -15,77 +44,273 @@ class Algorithm(IntEnum):
     BLAKE3_KEYED_MODE_256 = 3
 
 
+_ALGORITHM_NAMES = {
+    Algorithm.SHA3_KMAC_128: "SHA3-KMAC-128",
+    Algorithm.SHA3_KMAC_256: "SHA3-KMAC-256",
+    Algorithm.BLAKE3_KEYED_MODE_128: "BLAKE3-Keyed-Mode-128",
+    Algorithm.BLAKE3_KEYED_MODE_256: "BLAKE3-Keyed-Mode-256",
+}
+
+
+def _as_buffer(data):
+    """
+    Return `data` in a form ctypes.memmove can copy from
+    
+    bytes pass through unchanged; other contiguous bytes-like objects
+    (bytearray, memoryview, array, numpy arrays) are exposed zero-copy
+    when writable and copied once otherwise. len() of the result is
+    always the size in bytes.
+    """
+    if type(data) is bytes:
+        return data
+    view = memoryview(data).cast('B')
+    if view.readonly:
+        return view.tobytes()
+    return (ctypes.c_char * view.nbytes).from_buffer(view)
+
+
+def _artifact_path(wasm_path: Path) -> Path:
+    """
+    Location of the precompiled artifact for `wasm_path` in the per-user cache
+    
+    Artifacts only load on the wasmtime release and CPU architecture that
+    produced them, so both name the directory; the file name carries a
+    digest of the module so an upgraded package never picks up a stale one.
+    """
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha256(wasm_path.read_bytes()).hexdigest()[:16]
+    cache_dir = Path(root) / "passcode_py" / f"wasmtime-{version('wasmtime')}-{platform.machine()}"
+    return cache_dir / f"{wasm_path.stem}-{digest}.cwasm"
+
+
+def _load_module(engine: Engine, wasm_path: Path) -> tuple[Module, bool]:
+    """
+    Load the precompiled artifact for `wasm_path`, compiling the module if needed
+    
+    Returns the module and whether it was compiled here rather than
+    deserialized from the artifact.
+    """
+    try:
+        return Module.deserialize_file(engine, str(_artifact_path(wasm_path))), False
+    except (WasmtimeError, OSError, RuntimeError):
+        # No artifact yet, no home directory, or an artifact built with
+        # another engine configuration
+        pass
+    
+    return Module.from_file(engine, str(wasm_path)), True
+
+
+def _save_artifact(module: Module, wasm_path: Path):
+    """Atomically write the compiled module to the per-user cache"""
+    try:
+        cwasm_path = _artifact_path(wasm_path)
+        cwasm_path.parent.mkdir(parents=True, exist_ok=True)
+    except (OSError, RuntimeError):
+        # No writable cache directory; every process compiles the module instead
+        return
+    
+    tmp_path = cwasm_path.with_name(f"{cwasm_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(module.serialize())
+        os.replace(tmp_path, cwasm_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=None)
+def _shared_module() -> tuple[Engine, Module, bool]:
+    """Build the process-wide engine and compiled module shared by all runtimes"""
+    config = Config()
+    
+    # Map initial memory copy-on-write so creating a runtime is cheap, and
+    # keep linear memory inside its reservation so the cached base address
+    # stays valid when the guest grows it
+    config.memory_init_cow = True
+    config.memory_may_move = False
+    
+    engine = Engine(config)
+    return (engine, *_load_module(engine, _WASM_PATH))
+
+
+@lru_cache(maxsize=None)
+def _persist_shared_module():
+    """Save the shared module's artifact once it has been instantiated successfully"""
+    _, module, compiled = _shared_module()
+    if compiled:
+        _save_artifact(module, _WASM_PATH)
+
+
 class WasmRuntime:
     """Manages WASM instance and memory operations"""
     
     def __init__(self):
-        wasm_path = Path(__file__).parent / "passcode_wasm_bg.wasm"
-        self.store = Store()
-        
-        # Configure WASI (needed by wasm-bindgen)
-        wasi = WasiConfig()
-        self.store.set_wasi(wasi)
-        
-        # Create linker and define WASI
-        linker = Linker(self.store.engine)
-        linker.define_wasi()
+        engine, module, _ = _shared_module()
+        self.store = Store(engine)
         
-        # Add wasm-bindgen required imports
-        def wbindgen_throw(caller, ptr, len):
-            raise Exception("wasm-bindgen throw")
+        # The module's only import is the wasm-bindgen throw hook; its name
+        # carries a per-build hash, so match it by prefix
+        linker = Linker(engine)
+        for item in module.imports:
+            if item.module != _GLUE_MODULE or not item.name.startswith("__wbg_wbindgenthrow_"):
+                raise RuntimeError(f"Unsupported WASM import: {item.module}.{item.name}")
+            linker.define_func(item.module, item.name, item.type, self._throw)
         
-        linker.func_wrap("__wbindgen_placeholder__", "__wbindgen_throw", wbindgen_throw)
-        
-        # Load and instantiate module
-        module = Module.from_file(self.store.engine, str(wasm_path))
+        # Instantiate the shared module
         self.instance = linker.instantiate(self.store, module)
-        
-        # Cache exports
         exports = self.instance.exports(self.store)
-        self.memory = exports["memory"]
-        self._alloc = exports["__wbindgen_malloc"]
-        self._dealloc = exports["__wbindgen_free"]
         
-        # Get function exports
+        # Get function exports; exported functions that return a value
+        # write it through a return pointer passed as their first argument
         try:
+            self.memory = exports["memory"]
+            # Newer wasm-bindgen releases export malloc/free by index
+            self._alloc = exports.get("__wbindgen_malloc") or exports["__wbindgen_export_0"]
+            self._dealloc = exports.get("__wbindgen_free") or exports["__wbindgen_export_1"]
             self._passcode_new = exports["passcode_new"]
             self._passcode_compute = exports["passcode_compute"]
-            self._blake3_128 = exports["blake3KeyedMode128"]
+            self._passcode_free = exports["__wbg_passcode_free"]
             self._blake3_256 = exports["blake3KeyedMode256"]
+            self._blake3_512 = exports["blake3KeyedMode512"]
             self._sha3_128 = exports["sha3Kmac128"]
             self._sha3_256 = exports["sha3Kmac256"]
+            start = exports["__wbindgen_start"]
         except KeyError as e:
             raise RuntimeError(f"Missing WASM export: {e}")
+        
+        # Run the start function, as the generated JS glue does
+        start(self.store)
+        
+        # Serializes use of the Store: a Passcode may be shared between
+        # threads, and ctypes and wasmtime both release the GIL
+        self.lock = threading.RLock()
+        
+        # Passcode handles collected while another thread held the lock
+        self._released = []
+        
+        # Linear memory never moves (memory_may_move is off), so its base
+        # address only needs refreshing after a host-side grow
+        self._refresh_base()
+        
+        # Grow the guest heap once up front: the allocator keeps freed
+        # memory, so later allocations reuse it instead of calling
+        # memory.grow on the hot path
+        warmup_ptr = self._alloc(self.store, HEAP_RESERVE, 1)
+        self._dealloc(self.store, warmup_ptr, HEAP_RESERVE, 1)
+        
+        # Return-pointer slot shared by all calls on this runtime (never freed)
+        self._ret_ptr = self._alloc(self.store, _RESULT.size, 4)
+        
+        # Only write the compiled artifact for a module known to work here
+        _persist_shared_module()
+    
+    def release_handle(self, handle: int):
+        """
+        Free a passcode handle without blocking
+        
+        Called from Passcode.__del__, which may run on any thread. If the
+        lock is held elsewhere the handle is freed by the next write_bytes.
+        """
+        self._released.append(handle)
+        if self.lock.acquire(blocking=False):
+            try:
+                self._free_released()
+            finally:
+                self.lock.release()
+    
+    def _free_released(self):
+        """Free deferred passcode handles; the caller holds the lock"""
+        released = self._released
+        while released:
+            self._passcode_free(self.store, released.pop(), 0)
+    
+    def _throw(self, ptr: int, length: int):
+        """wasm-bindgen throw hook: surface the guest's message as a trap"""
+        message = ctypes.string_at(self._base + ptr, length).decode('utf-8', 'replace')
+        raise RuntimeError(message)
+    
+    def _refresh_base(self):
+        """Recompute the cached base address and view of linear memory"""
+        self._base = ctypes.addressof(self.memory.data_ptr(self.store).contents)
+        # Memory grows in place up to its maximum (4 GiB without one), so
+        # a view over that range covers every pointer the guest returns;
+        # only the pages below the current size are ever read through it
+        maximum = self.memory.type(self.store).limits.max or 65536
+        self._mv = memoryview((ctypes.c_ubyte * (maximum * 65536)).from_address(self._base))
+    
+    def grow(self, pages: int) -> int:
+        """Grow linear memory by `pages` and refresh the cached base address"""
+        previous = self.memory.grow(self.store, pages)
+        self._refresh_base()
+        return previous
     
     def write_bytes(self, data: bytes) -> tuple[int, int]:
-        """Write bytes to WASM memory, return (ptr, len)"""
+        """
+        Write bytes (or a _as_buffer result) to WASM memory, return (ptr, len)
+        
+        Exports take ownership of &[u8] arguments and free them on return,
+        so the caller must not free a buffer it has passed to the guest.
+        The caller holds the lock.
+        """
+        if self._released:
+            self._free_released()
         length = len(data)
         ptr = self._alloc(self.store, length, 1)
-        memory_data = self.memory.data_ptr(self.store)
-        for i, byte in enumerate(data):
-            memory_data[ptr + i] = byte
+        ctypes.memmove(self._base + ptr, data, length)
         return ptr, length
     
     def free_bytes(self, ptr: int, length: int):
         """Free WASM memory"""
-        if ptr > 0:
-            self._dealloc(self.store, ptr, length, 1)
+        self._dealloc(self.store, ptr, length, 1)
     
-    def read_string(self, ptr: int) -> str:
-        """Read wasm-bindgen encoded string (ptr to [data_ptr, length])"""
-        memory_data = self.memory.data_ptr(self.store)
-        
-        # Read string pointer and length (both i32, little endian)
-        str_ptr = int.from_bytes(memory_data[ptr:ptr+4], 'little')
-        str_len = int.from_bytes(memory_data[ptr+4:ptr+8], 'little')
-        
-        # Read actual string bytes
-        string_bytes = bytes(memory_data[str_ptr:str_ptr + str_len])
-        return string_bytes.decode('utf-8')
+    def read_result(self) -> bytes:
+        """Copy the String/Vec<u8> returned through the return pointer and free it"""
+        ptr, length = _HDR.unpack_from(self._mv, self._ret_ptr)
+        try:
+            return ctypes.string_at(self._base + ptr, length)
+        finally:
+            self.free_bytes(ptr, length)
+
+
+def make_runtime() -> WasmRuntime:
+    """
+    Create an independent WasmRuntime
+    
+    Every runtime has its own Store and instance but shares the compiled
+    module, so servers can keep one runtime per worker thread instead of
+    sharing one Store across threads.
+    """
+    return WasmRuntime()
+
+
+# One WasmRuntime per thread: wasmtime Stores must not be used concurrently
+_thread_state = threading.local()
+
+
+def _thread_runtime() -> WasmRuntime:
+    """Return the calling thread's WasmRuntime, creating it on first use"""
+    try:
+        return _thread_state.runtime
+    except AttributeError:
+        runtime = _thread_state.runtime = make_runtime()
+        return runtime
+
+
+def release_thread_runtime():
+    """
+    Drop the calling thread's WasmRuntime
+    
+    Call this when a long-lived worker thread stops computing OTPs. The
+    runtime is freed once no Passcode created on this thread refers to it.
+    """
+    _thread_state.__dict__.pop("runtime", None)
 
 
-# Global WASM runtime instance
-_runtime = WasmRuntime()
+# Create the importing thread's runtime eagerly so load failures surface
+# at import time and the package can fall back to another backend
+_thread_runtime()
 
 
 class Passcode:
@@ -102,135 +327,167 @@ class Passcode:
         if not isinstance(key, bytes):
             raise TypeError("key must be bytes")
         
+        # The guest traps on an unknown enum value; reject it here instead
+        if algorithm not in _ALGORITHM_NAMES:
+            raise ValueError(f"unsupported algorithm: {algorithm}")
+        
         self.algorithm = algorithm
         self.key = key
         
-        # Create instance in WASM
-        key_ptr, key_len = _runtime.write_bytes(key)
-        try:
-            self._handle = _runtime._passcode_new(
-                _runtime.store, 
-                int(algorithm), 
-                key_ptr, 
+        # The guest-side instance lives in the creating thread's runtime;
+        # any thread may use it, serialized by that runtime's lock
+        runtime = self._runtime = _thread_runtime()
+        
+        # Create instance in WASM; the guest takes ownership of the key copy
+        with runtime.lock:
+            key_ptr, key_len = runtime.write_bytes(key)
+            runtime._passcode_new(
+                runtime.store,
+                runtime._ret_ptr,
+                int(algorithm),
+                key_ptr,
                 key_len
             )
-        finally:
-            _runtime.free_bytes(key_ptr, key_len)
+            # Result<Passcode, JsValue>: (handle, error, is_error)
+            handle, _, is_error = _RESULT.unpack_from(runtime._mv, runtime._ret_ptr)
+        if is_error:
+            raise RuntimeError("passcode_new failed")
+        self._handle = handle
+    
+    def __del__(self):
+        # The key stays resident in the guest-side instance until freed here
+        handle = getattr(self, "_handle", None)
+        if handle:
+            self._runtime.release_handle(handle)
+            self._handle = None
     
     def compute(self, data: bytes) -> str:
         """
         Compute OTP from challenge data
         
         Args:
-            data: Challenge data (bytes)
-            
+            data: Challenge data (bytes-like)
+        
         Returns:
             12-character hexadecimal OTP string
         """
-        if not isinstance(data, bytes):
-            raise TypeError("data must be bytes")
+        return self.compute_bytes(data).decode('ascii')
+    
+    def compute_bytes(self, data: bytes) -> bytes:
+        """
+        Compute OTP from challenge data without decoding it
         
-        data_ptr, data_len = _runtime.write_bytes(data)
-        try:
-            result_ptr = _runtime._passcode_compute(
-                _runtime.store, 
-                self._handle, 
-                data_ptr, 
+        Args:
+            data: Challenge data (bytes-like)
+        
+        Returns:
+            12-character hexadecimal OTP as ASCII bytes
+        """
+        data = _as_buffer(data)
+        runtime = self._runtime
+        with runtime.lock:
+            data_ptr, data_len = runtime.write_bytes(data)
+            runtime._passcode_compute(
+                runtime.store,
+                runtime._ret_ptr,
+                self._handle,
+                data_ptr,
                 data_len
             )
-            return _runtime.read_string(result_ptr)
-        finally:
-            _runtime.free_bytes(data_ptr, data_len)
+            return runtime.read_result()
+    
+    def compute_many(self, challenges: list[bytes]) -> list[str]:
+        """
+        Compute OTPs for a batch of challenges
+        
+        Args:
+            challenges: Challenge data for each OTP (list of bytes)
+            
+        Returns:
+            List of 12-character hexadecimal OTP strings, in order
+        """
+        compute = self.compute
+        # Hold the (reentrant) lock once for the whole batch
+        with self._runtime.lock:
+            return [compute(data) for data in challenges]
     
     def algorithm_name(self) -> str:
         """Get the name of the algorithm"""
-        names = {
-            Algorithm.SHA3_KMAC_128: "SHA3-KMAC-128",
-            Algorithm.SHA3_KMAC_256: "SHA3-KMAC-256",
-            Algorithm.BLAKE3_KEYED_MODE_128: "BLAKE3-Keyed-Mode-128",
-            Algorithm.BLAKE3_KEYED_MODE_256: "BLAKE3-Keyed-Mode-256",
-        }
-        return names.get(self.algorithm, "Unknown")
+        return _ALGORITHM_NAMES.get(self.algorithm, "Unknown")
 
 
 # Utility functions
 def blake3_keyed_mode_128(key: bytes, data: bytes) -> str:
-    """Compute BLAKE3-128 hash"""
-    if not isinstance(key, bytes) or not isinstance(data, bytes):
-        raise TypeError("key and data must be bytes")
-    
-    key_ptr, key_len = _runtime.write_bytes(key)
-    data_ptr, data_len = _runtime.write_bytes(data)
-    try:
-        result_ptr = _runtime._blake3_128(
-            _runtime.store, 
-            key_ptr, key_len, 
+    """Compute BLAKE3-128 hash (32-byte digest, as used by BLAKE3_KEYED_MODE_128), hex encoded"""
+    key = _as_buffer(key)
+    data = _as_buffer(data)
+    runtime = _thread_runtime()
+    with runtime.lock:
+        key_ptr, key_len = runtime.write_bytes(key)
+        data_ptr, data_len = runtime.write_bytes(data)
+        runtime._blake3_256(
+            runtime.store,
+            runtime._ret_ptr,
+            key_ptr, key_len,
             data_ptr, data_len
         )
-        return _runtime.read_string(result_ptr)
-    finally:
-        _runtime.free_bytes(key_ptr, key_len)
-        _runtime.free_bytes(data_ptr, data_len)
+        return runtime.read_result().hex()
 
 
 def blake3_keyed_mode_256(key: bytes, data: bytes) -> str:
-    """Compute BLAKE3-256 hash"""
-    if not isinstance(key, bytes) or not isinstance(data, bytes):
-        raise TypeError("key and data must be bytes")
-    
-    key_ptr, key_len = _runtime.write_bytes(key)
-    data_ptr, data_len = _runtime.write_bytes(data)
-    try:
-        result_ptr = _runtime._blake3_256(
-            _runtime.store, 
-            key_ptr, key_len, 
+    """Compute BLAKE3-256 hash (64-byte digest, as used by BLAKE3_KEYED_MODE_256), hex encoded"""
+    key = _as_buffer(key)
+    data = _as_buffer(data)
+    runtime = _thread_runtime()
+    with runtime.lock:
+        key_ptr, key_len = runtime.write_bytes(key)
+        data_ptr, data_len = runtime.write_bytes(data)
+        runtime._blake3_512(
+            runtime.store,
+            runtime._ret_ptr,
+            key_ptr, key_len,
             data_ptr, data_len
         )
-        return _runtime.read_string(result_ptr)
-    finally:
-        _runtime.free_bytes(key_ptr, key_len)
-        _runtime.free_bytes(data_ptr, data_len)
+        return runtime.read_result().hex()
 
 
 def sha3_kmac_128(key: bytes, customization: bytes, data: bytes) -> str:
-    """Compute SHA3-KMAC-128 hash"""
-    if not all(isinstance(x, bytes) for x in [key, customization, data]):
-        raise TypeError("key, customization, and data must be bytes")
-    
-    key_ptr, key_len = _runtime.write_bytes(key)
-    cust_ptr, cust_len = _runtime.write_bytes(customization)
-    data_ptr, data_len = _runtime.write_bytes(data)
-    try:
-        result_ptr = _runtime._sha3_128(
-            _runtime.store,
+    """Compute SHA3-KMAC-128 hash (32-byte digest), hex encoded"""
+    key = _as_buffer(key)
+    customization = _as_buffer(customization)
+    data = _as_buffer(data)
+    runtime = _thread_runtime()
+    with runtime.lock:
+        key_ptr, key_len = runtime.write_bytes(key)
+        cust_ptr, cust_len = runtime.write_bytes(customization)
+        data_ptr, data_len = runtime.write_bytes(data)
+        runtime._sha3_128(
+            runtime.store,
+            runtime._ret_ptr,
             key_ptr, key_len,
             cust_ptr, cust_len,
-            data_ptr, data_len
+            data_ptr, data_len,
+            _KMAC_OUTPUT_LEN
         )
-        return _runtime.read_string(result_ptr)
-    finally:
-        _runtime.free_bytes(key_ptr, key_len)
-        _runtime.free_bytes(cust_ptr, cust_len)
-        _runtime.free_bytes(data_ptr, data_len)
+        return runtime.read_result().hex()
 
 
 def sha3_kmac_256(key: bytes, customization: bytes, data: bytes) -> str:
-    """Compute SHA3-KMAC-256 hash"""
-    if not all(isinstance(x, bytes) for x in [key, customization, data]):
-        raise TypeError("key, customization, and data must be bytes")
-    
-    key_ptr, key_len = _runtime.write_bytes(key)
-    cust_ptr, cust_len = _runtime.write_bytes(customization)
-    data_ptr, data_len = _runtime.write_bytes(data)
-    try:
-        result_ptr = _runtime._sha3_256(
-            _runtime.store,
+    """Compute SHA3-KMAC-256 hash (32-byte digest), hex encoded"""
+    key = _as_buffer(key)
+    customization = _as_buffer(customization)
+    data = _as_buffer(data)
+    runtime = _thread_runtime()
+    with runtime.lock:
+        key_ptr, key_len = runtime.write_bytes(key)
+        cust_ptr, cust_len = runtime.write_bytes(customization)
+        data_ptr, data_len = runtime.write_bytes(data)
+        runtime._sha3_256(
+            runtime.store,
+            runtime._ret_ptr,
             key_ptr, key_len,
             cust_ptr, cust_len,
-            data_ptr, data_len
+            data_ptr, data_len,
+            _KMAC_OUTPUT_LEN
         )
-        return _runtime.read_string(result_ptr)
-    finally:
-        _runtime.free_bytes(key_ptr, key_len)
-        _runtime.free_bytes(cust_ptr, cust_len)
-        _runtime.free_bytes(data_ptr, data_len)
+        return runtime.read_result().hex()
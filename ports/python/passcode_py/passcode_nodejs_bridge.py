@@ -2,13 +2,202 @@
 """
 Python wrapper for Passcode using Node.js bridge
 This is a simpler approach that uses the Node.js WASM implementation
+through a single long-lived Node.js process, or computes in-process with
+Numba-compiled KMAC and the blake3 package when they are installed
 """
 
+import atexit
+import struct
 import subprocess
-import json
+import threading
 from enum import IntEnum
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+
+# Persistent Node.js sidecar: reads length-prefixed requests
+# ([op u8][arg u32][payload]) from stdin and writes length-prefixed
+# responses ([status u8][body or error message]) to stdout.
+#   register: arg = algorithm, payload = key  -> body = instance id (u32)
+#   compute:  arg = instance id, payload = data -> body = OTP
+#   release:  arg = instance id               -> empty body
+_SERVER_JS = """
+const { Passcode } = require(process.argv[1]);
+const instances = new Map();
+let nextId = 1;
+let pending = Buffer.alloc(0);
+process.stdin.on('data', (chunk) => {
+  pending = Buffer.concat([pending, chunk]);
+  while (pending.length >= 4) {
+    const length = pending.readUInt32LE(0);
+    if (pending.length < 4 + length) break;
+    const message = pending.subarray(4, 4 + length);
+    pending = pending.subarray(4 + length);
+
+    let status = 0;
+    let body = Buffer.alloc(0);
+    try {
+      const arg = message.readUInt32LE(1);
+      const payload = message.subarray(5);
+      switch (message[0]) {
+        case 0:
+          instances.set(nextId, new Passcode(arg, Buffer.from(payload)));
+          body = Buffer.alloc(4);
+          body.writeUInt32LE(nextId++, 0);
+          break;
+        case 1:
+          body = Buffer.from(instances.get(arg).compute(payload), 'ascii');
+          break;
+        case 2:
+          instances.delete(arg);
+          break;
+        default:
+          throw new Error('unknown op ' + message[0]);
+      }
+    } catch (err) {
+      status = 1;
+      body = Buffer.from(String(err), 'utf8');
+    }
+
+    const header = Buffer.alloc(5);
+    header.writeUInt32LE(body.length + 1, 0);
+    header[4] = status;
+    process.stdout.write(Buffer.concat([header, body]));
+  }
+});
+"""
+
+_NODEJS_MODULE = Path(__file__).parent.parent.parent / "nodejs"
+
+# KMAC customization string used for OTP computation
+_AUTH = b"authorization"
+
+_OP_REGISTER = 0
+_OP_COMPUTE = 1
+_OP_RELEASE = 2
+
+_REQUEST_HEADER = struct.Struct("<IBI")
+_RESPONSE_HEADER = struct.Struct("<IB")
+_INSTANCE_ID = struct.Struct("<I")
+
+# Seconds to wait for the sidecar to exit at interpreter shutdown
+_STOP_TIMEOUT = 5
+
+_sidecar = None
+_sidecar_generation = 0
+_sidecar_lock = threading.Lock()
+
+# Sidecar instances released by garbage-collected Passcode objects; sent
+# on the next request so __del__ never blocks on the pipe
+_released = []
+
+
+def _close_pipes(proc: subprocess.Popen):
+    """Close the sidecar's pipes, ignoring writes that can no longer be flushed"""
+    for stream in (proc.stdin, proc.stdout):
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+
+def _get_sidecar() -> subprocess.Popen:
+    """Return the running Node.js sidecar, starting it on first use"""
+    global _sidecar, _sidecar_generation
+    if _sidecar is None or _sidecar.poll() is not None:
+        if _sidecar is not None:
+            _close_pipes(_sidecar)
+        _sidecar = subprocess.Popen(
+            ['node', '-e', _SERVER_JS, str(_NODEJS_MODULE)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        _sidecar_generation += 1
+    return _sidecar
+
+
+def _read_exact(stream, length: int) -> bytes:
+    """Read exactly `length` bytes from the sidecar"""
+    chunks = []
+    while length > 0:
+        chunk = stream.read(length)
+        if not chunk:
+            raise RuntimeError("Node.js sidecar exited unexpectedly")
+        chunks.append(chunk)
+        length -= len(chunk)
+    return b"".join(chunks)
+
+
+def _kill_sidecar(proc: subprocess.Popen):
+    """Kill `proc` and forget it so the next request starts a new sidecar"""
+    global _sidecar
+    proc.kill()
+    proc.wait()
+    _close_pipes(proc)
+    if _sidecar is proc:
+        _sidecar = None
+
+
+def _exchange(proc: subprocess.Popen, op: int, arg: int, payload: bytes = b"") -> bytes:
+    """Send one request to the sidecar and return the response body"""
+    try:
+        # Payload length covers the op byte, the argument and the payload
+        proc.stdin.write(_REQUEST_HEADER.pack(5 + len(payload), op, arg) + payload)
+        proc.stdin.flush()
+        length, status = _RESPONSE_HEADER.unpack(_read_exact(proc.stdout, _RESPONSE_HEADER.size))
+        body = _read_exact(proc.stdout, length - 1)
+    except BaseException:
+        # A partly written request or partly read response leaves the pipe
+        # out of sync, so this sidecar cannot be used again
+        _kill_sidecar(proc)
+        raise
+    
+    if status != 0:
+        raise RuntimeError(f"Node.js sidecar error: {body.decode('utf-8')}")
+    return body
+
+
+def _sidecar_compute(passcode: "Passcode", data: bytes) -> bytes:
+    """Compute one OTP through the persistent Node.js sidecar"""
+    with _sidecar_lock:
+        proc = _get_sidecar()
+        generation = _sidecar_generation
+        
+        while _released:
+            released_generation, instance_id = _released.pop()
+            if released_generation == generation:
+                _exchange(proc, _OP_RELEASE, instance_id)
+        
+        # Register the key once per Passcode (and again after a restart)
+        ref = passcode._sidecar_ref
+        if ref is None or ref[0] != generation:
+            body = _exchange(proc, _OP_REGISTER, int(passcode.algorithm), passcode.key)
+            ref = passcode._sidecar_ref = (generation, _INSTANCE_ID.unpack(body)[0])
+        
+        return _exchange(proc, _OP_COMPUTE, ref[1], data)
+
+
+@atexit.register
+def _stop_sidecar():
+    """Close the sidecar's stdin so it exits with the interpreter"""
+    global _sidecar
+    proc = _sidecar
+    if proc is not None and proc.poll() is None:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=_STOP_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            # Never let a hung sidecar hang interpreter exit
+            _kill_sidecar(proc)
+        else:
+            _close_pipes(proc)
+    _sidecar = None
+
 
 class Algorithm(IntEnum):
     """Supported hash algorithms"""
@@ -18,6 +207,54 @@ class Algorithm(IntEnum):
     BLAKE3_KEYED_MODE_256 = 3
 
 
+@lru_cache(maxsize=None)
+def _keccak():
+    """Import the Numba KMAC module on first use; None when numba/numpy are missing"""
+    # Importing numba is slow, so BLAKE3-only users never pay for it
+    try:
+        from . import _keccak_numba
+    except ImportError:
+        return None
+    return _keccak_numba
+
+
+def _sha3_kmac_hasher(name: str):
+    """Return a factory binding a key to the in-process KMAC OTP function `name`"""
+    def bind(key: bytes):
+        keccak = _keccak()
+        if keccak is None:
+            return None
+        # Key and customization are absorbed once; calls only hash the data
+        kmac = getattr(keccak, name)(key, _AUTH, 32)
+        return lambda data: kmac(data)[:6].hex().encode('ascii')
+    return bind
+
+
+def _blake3_hasher(key: bytes):
+    """Bind a key to an in-process BLAKE3 keyed-mode OTP function"""
+    # Keyed mode uses the BLAKE3 hash of the key; the OTP is the first
+    # 6 output bytes, which do not depend on the requested length
+    hashed_key = blake3(key).digest()
+    return lambda data: blake3(data, key=hashed_key).digest(length=6).hex().encode('ascii')
+
+
+# In-process OTP factories indexed by Algorithm value; None (or a factory
+# returning None) when the optional blake3/numba package is not installed
+_DISPATCH = (
+    _sha3_kmac_hasher("kmac128_keyed"),
+    _sha3_kmac_hasher("kmac256_keyed"),
+    _blake3_hasher if blake3 is not None else None,
+    _blake3_hasher if blake3 is not None else None,
+)
+
+_ALGORITHM_NAMES = {
+    Algorithm.SHA3_KMAC_128: "SHA3-KMAC-128",
+    Algorithm.SHA3_KMAC_256: "SHA3-KMAC-256",
+    Algorithm.BLAKE3_KEYED_MODE_128: "BLAKE3-Keyed-Mode-128",
+    Algorithm.BLAKE3_KEYED_MODE_256: "BLAKE3-Keyed-Mode-256",
+}
+
+
 class Passcode:
     """Challenge-response OTP generator"""
     
@@ -34,44 +271,62 @@ class Passcode:
         
         self.algorithm = algorithm
         self.key = key
+        
+        # Bind the in-process implementation once when numba/blake3 are
+        # installed; compute then calls it directly
+        bind = _DISPATCH[algorithm] if 0 <= algorithm < len(_DISPATCH) else None
+        self._local = bind(key) if bind is not None else None
+        
+        # (sidecar generation, instance id) once the key is registered
+        self._sidecar_ref = None
+    
+    def __del__(self):
+        ref = getattr(self, "_sidecar_ref", None)
+        if ref is not None:
+            _released.append(ref)
     
     def compute(self, data: bytes) -> str:
         """
-        Compute OTP from challenge data via Node.js
+        Compute OTP from challenge data in-process or via the Node.js sidecar
         
         Args:
-            data: Challenge data (bytes)
+            data: Challenge data (bytes-like)
             
         Returns:
             12-character hexadecimal OTP string
         """
-        if not isinstance(data, bytes):
-            raise TypeError("data must be bytes")
+        return self.compute_bytes(data).decode('ascii')
+    
+    def compute_bytes(self, data: bytes) -> bytes:
+        """
+        Compute OTP from challenge data without decoding it
         
-        # Call Node.js script
-        script = f"""
-const {{ Passcode, Algorithm }} = require('{Path(__file__).parent.parent.parent / "nodejs"}');
-const key = Buffer.from('{self.key.hex()}', 'hex');
-const data = Buffer.from('{data.hex()}', 'hex');
-const passcode = new Passcode({int(self.algorithm)}, key);
-console.log(passcode.compute(data));
-"""
+        Args:
+            data: Challenge data (bytes-like)
+            
+        Returns:
+            12-character hexadecimal OTP as ASCII bytes
+        """
+        if type(data) is not bytes:
+            data = memoryview(data).tobytes()
         
-        result = subprocess.run(
-            ['node', '-e', script],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if self._local is not None:
+            return self._local(data)
+        return _sidecar_compute(self, data)
+    
+    def compute_many(self, challenges: list[bytes]) -> list[str]:
+        """
+        Compute OTPs for a batch of challenges
         
-        return result.stdout.strip()
+        Args:
+            challenges: Challenge data for each OTP (list of bytes)
+            
+        Returns:
+            List of 12-character hexadecimal OTP strings, in order
+        """
+        compute = self.compute
+        return [compute(data) for data in challenges]
     
     def algorithm_name(self) -> str:
         """Get the name of the algorithm"""
-        names = {
-            Algorithm.SHA3_KMAC_128: "SHA3-KMAC-128",
-            Algorithm.SHA3_KMAC_256: "SHA3-KMAC-256",
-            Algorithm.BLAKE3_KEYED_MODE_128: "BLAKE3-Keyed-Mode-128",
-            Algorithm.BLAKE3_KEYED_MODE_256: "BLAKE3-Keyed-Mode-256",
-        }
-        return names.get(self.algorithm, "Unknown")
+        return _ALGORITHM_NAMES.get(self.algorithm, "Unknown")
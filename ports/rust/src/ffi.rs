@@ -55,6 +55,52 @@ pub extern "C" fn passcode_compute(
     result_bytes.len() as i32
 }
 
+/// Compute OTPs for a batch of challenges in a single call
+/// `data_ptr` holds the challenges back to back and `lens_ptr` their lengths.
+/// Writes `count` 12-character OTPs without separators to `out_ptr`.
+/// Returns the number of OTPs written, or -2 if `count` does not fit the
+/// return value, the sizes overflow, or the output buffer is too small
+#[no_mangle]
+pub extern "C" fn passcode_compute_many(
+    passcode_ptr: *mut Passcode,
+    data_ptr: *const u8,
+    lens_ptr: *const usize,
+    count: usize,
+    out_ptr: *mut u8,
+    out_len: usize,
+) -> i32 {
+    if passcode_ptr.is_null() || data_ptr.is_null() || lens_ptr.is_null() || out_ptr.is_null() {
+        return -1;
+    }
+
+    if count > i32::MAX as usize {
+        return -2; // Count does not fit the return value
+    }
+
+    let otps_len = match count.checked_mul(12) {
+        Some(otps_len) if otps_len <= out_len => otps_len,
+        _ => return -2, // Overflow or buffer too small
+    };
+
+    let passcode = unsafe { &*passcode_ptr };
+    let lens = unsafe { slice::from_raw_parts(lens_ptr, count) };
+    let total = match lens.iter().try_fold(0usize, |total, &len| total.checked_add(len)) {
+        Some(total) => total,
+        None => return -2, // Lengths overflow usize
+    };
+    let data = unsafe { slice::from_raw_parts(data_ptr, total) };
+    let out = unsafe { slice::from_raw_parts_mut(out_ptr, otps_len) };
+
+    let mut offset = 0;
+    for (i, &len) in lens.iter().enumerate() {
+        let result = passcode.compute(&data[offset..offset + len]);
+        out[i * 12..(i + 1) * 12].copy_from_slice(result.as_bytes());
+        offset += len;
+    }
+
+    count as i32
+}
+
 /// Free a Passcode instance
 #[no_mangle]
 pub extern "C" fn passcode_free(passcode_ptr: *mut Passcode) {
@@ -35,6 +35,31 @@ impl std::fmt::Display for Algorithm {
 /// Hasher function type
 type Hasher = fn(&[u8], &[u8]) -> Vec<u8>;
 
+/// Encodes a big-endian 32-bit word as 8 lowercase hex digits using SWAR
+fn hex_swar(word: u32) -> [u8; 8] {
+    let x = word as u64;
+
+    // Spread the 8 nibbles into the low nibble of 8 separate bytes
+    let mut n = ((x & 0xFFFF_0000) << 16) | (x & 0x0000_FFFF);
+    n = ((n & 0x0000_FF00_0000_FF00) << 8) | (n & 0x0000_00FF_0000_00FF);
+    n = ((n & 0x00F0_00F0_00F0_00F0) << 4) | (n & 0x000F_000F_000F_000F);
+
+    // Add '0' to every byte, plus ('a' - '0' - 10) to the bytes >= 10
+    let letters = ((n + 0x0606_0606_0606_0606) >> 4) & 0x0101_0101_0101_0101;
+    (n + 0x3030_3030_3030_3030 + letters * 0x27).to_be_bytes()
+}
+
+/// Encodes the 6-byte OTP prefix as 12 lowercase hex digits
+fn encode_otp(bytes: &[u8]) -> String {
+    let high = hex_swar(u32::from_be_bytes([bytes[0], bytes[1], bytes[2], bytes[3]]));
+    let low = hex_swar(u32::from_be_bytes([0, 0, bytes[4], bytes[5]]));
+
+    let mut out = Vec::with_capacity(12);
+    out.extend_from_slice(&high);
+    out.extend_from_slice(&low[4..]);
+    String::from_utf8(out).expect("hex digits are ASCII")
+}
+
 /// Passcode struct for Challenge-Response based OTP authentication
 pub struct Passcode {
     algorithm: Algorithm,
@@ -98,7 +123,31 @@ impl Passcode {
         }
 
         // Convert first 6 bytes to hex string
-        hex::encode(&hashed[..6])
+        encode_otp(&hashed[..6])
+    }
+
+    /// Computes OTPs for a batch of challenges
+    ///
+    /// # Arguments
+    /// * `challenges` - The challenge data for each OTP
+    ///
+    /// # Returns
+    /// One 12-character hexadecimal OTP string per challenge, in order
+    ///
+    /// # Example
+    /// ```
+    /// use passcode::{Passcode, Algorithm};
+    ///
+    /// let key = vec![0u8; 32];
+    /// let passcode = Passcode::new(Algorithm::Blake3KeyedMode256, key);
+    /// let otps = passcode.compute_many(&[vec![0u8; 16], vec![1u8; 16]]);
+    /// assert_eq!(otps.len(), 2);
+    /// ```
+    pub fn compute_many<D: AsRef<[u8]>>(&self, challenges: &[D]) -> Vec<String> {
+        challenges
+            .iter()
+            .map(|data| self.compute(data.as_ref()))
+            .collect()
     }
 
     /// Gets the algorithm being used
@@ -134,6 +183,20 @@ mod tests {
         assert!(otp.chars().all(|c| c.is_ascii_hexdigit()));
     }
 
+    #[test]
+    fn test_encode_otp_matches_hex() {
+        let samples: [[u8; 6]; 4] = [
+            [0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
+            [0xff, 0xff, 0xff, 0xff, 0xff, 0xff],
+            [0x09, 0xa0, 0xa9, 0x90, 0x0a, 0x9f],
+            [0x12, 0x34, 0x56, 0x78, 0x9a, 0xbc],
+        ];
+
+        for bytes in &samples {
+            assert_eq!(encode_otp(bytes), hex::encode(bytes));
+        }
+    }
+
     #[test]
     fn test_consistent_otp() {
         let key = vec![1u8; 32];
@@ -54,6 +54,29 @@ fn test_otp_consistency() {
     assert_eq!(otp1, otp2);
 }
 
+#[test]
+fn test_compute_many_matches_compute() {
+    let key = random_bytes(32);
+    let challenges: Vec<Vec<u8>> = (0..8).map(|i| random_bytes(i * 4)).collect();
+
+    let algorithms = [
+        Algorithm::Sha3Kmac128,
+        Algorithm::Sha3Kmac256,
+        Algorithm::Blake3KeyedMode128,
+        Algorithm::Blake3KeyedMode256,
+    ];
+
+    for algo in &algorithms {
+        let passcode = Passcode::new(*algo, key.clone());
+        let otps = passcode.compute_many(&challenges);
+
+        assert_eq!(otps.len(), challenges.len());
+        for (otp, challenge) in otps.iter().zip(&challenges) {
+            assert_eq!(*otp, passcode.compute(challenge));
+        }
+    }
+}
+
 #[test]
 fn test_different_challenges() {
     let key = random_bytes(32);
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Checks the in-process fallback: Numba KMAC against NIST SP 800-185 and the fixed OTP vectors"""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ports" / "python"))
+
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None and importlib.util.find_spec("numpy") is not None
+HAVE_BLAKE3 = importlib.util.find_spec("blake3") is not None
+
+KEY = bytes.fromhex("0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef")
+CHALLENGE = bytes.fromhex("fedcba9876543210fedcba9876543210")
+
+# NIST SP 800-185 KMAC samples: key 0x40..0x5F, data 00..03 or 00..C7
+NIST_KEY = bytes(range(0x40, 0x60))
+TAG = b"My Tagged Application"
+NIST_SAMPLES = [
+    ("kmac128", bytes(range(4)), b"", 32,
+     "e5780b0d3ea6f7d3a429c5706aa43a00fadbd7d49628839e3187243f456ee14e"),
+    ("kmac128", bytes(range(4)), TAG, 32,
+     "3b1fba963cd8b0b59e8c1a6d71888b7143651af8ba0a7070c0979e2811324aa5"),
+    ("kmac128", bytes(range(200)), TAG, 32,
+     "1f5b4e6cca02209e0dcb5ca635b89a15e271ecc760071dfd805faa38f9729230"),
+    ("kmac256", bytes(range(4)), TAG, 64,
+     "20c570c31346f703c9ac36c61c03cb64c3970d0cfc787e9b79599d273a68d2f7"
+     "f69d4cc3de9d104a351689f27cf6f5951f0103f33f4f24871024d9c27773a8dd"),
+    ("kmac256", bytes(range(200)), b"", 64,
+     "75358cf39e41494e949707927cee0af20a3ff553904c86b08f21cc414bcfd691"
+     "589d27cf5e15369cbbff8b9a4c2eb17800855d0235ff635da82533ec6b759b69"),
+    ("kmac256", bytes(range(200)), TAG, 64,
+     "b58618f71f92e1d56c1b8c55ddd7cd188b97b4ca4d99831eb2699a837da2e4d9"
+     "70fbacfde50033aea585f1a2708510c32d07880801bd182898fe476876fc8965"),
+]
+
+
+@unittest.skipUnless(HAVE_NUMBA, "numba/numpy are not installed")
+class KmacTest(unittest.TestCase):
+    def test_nist_samples(self):
+        from passcode_py import _keccak_numba
+        for name, data, customization, output_len, expected in NIST_SAMPLES:
+            with self.subTest(name=name, data_len=len(data), customization=customization):
+                kmac = getattr(_keccak_numba, name)
+                self.assertEqual(kmac(NIST_KEY, customization, data, output_len).hex(), expected)
+                keyed = getattr(_keccak_numba, name + "_keyed")(NIST_KEY, customization, output_len)
+                self.assertEqual(keyed(data).hex(), expected)
+
+    def test_block_boundaries(self):
+        from passcode_py import _keccak_numba
+        # Lengths around the KMAC128 (168) and KMAC256 (136) rates
+        for length in (0, 1, 132, 133, 135, 136, 137, 164, 165, 167, 168, 169, 336):
+            data = bytes(i % 251 for i in range(length))
+            with self.subTest(length=length):
+                for name in ("kmac128", "kmac256"):
+                    expected = getattr(_keccak_numba, name)(KEY, b"authorization", data, 32)
+                    keyed = getattr(_keccak_numba, name + "_keyed")(KEY, b"authorization", 32)
+                    self.assertEqual(keyed(data), expected)
+
+    def test_otp_vectors(self):
+        from passcode_py.passcode_nodejs_bridge import Algorithm, Passcode
+        for name, expected in (("SHA3_KMAC_128", "2ce05573dd4e"), ("SHA3_KMAC_256", "f391e239e588")):
+            with self.subTest(name):
+                passcode = Passcode(Algorithm[name], KEY)
+                self.assertIsNotNone(passcode._local)
+                self.assertEqual(passcode.compute(CHALLENGE), expected)
+
+
+@unittest.skipUnless(HAVE_BLAKE3, "blake3 is not installed")
+class Blake3Test(unittest.TestCase):
+    def test_otp_vectors(self):
+        from passcode_py.passcode_nodejs_bridge import Algorithm, Passcode
+        for name in ("BLAKE3_KEYED_MODE_128", "BLAKE3_KEYED_MODE_256"):
+            with self.subTest(name):
+                passcode = Passcode(Algorithm[name], KEY)
+                self.assertIsNotNone(passcode._local)
+                self.assertEqual(passcode.compute(CHALLENGE), "2ce4568631de")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Checks the native ctypes backend against the fixed vectors
+
+Loads the library named by PASSCODE_NATIVE_LIB, or the release build in
+ports/rust/target when it is unset:
+
+    cd ports/rust && cargo build --release
+"""
+
+import array
+import ctypes
+import importlib
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ports" / "python"))
+
+KEY = bytes.fromhex("0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef")
+CHALLENGE = bytes.fromhex("fedcba9876543210fedcba9876543210")
+
+EXPECTED = {
+    "SHA3_KMAC_128": "2ce05573dd4e",
+    "SHA3_KMAC_256": "f391e239e588",
+    "BLAKE3_KEYED_MODE_128": "2ce4568631de",
+    "BLAKE3_KEYED_MODE_256": "2ce4568631de",
+}
+
+
+def _library_path() -> Path:
+    override = os.environ.get("PASSCODE_NATIVE_LIB")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        name = "passcode.dll"
+    elif sys.platform == "darwin":
+        name = "libpasscode.dylib"
+    else:
+        name = "libpasscode.so"
+    return Path(__file__).parent.parent / "ports" / "rust" / "target" / "release" / name
+
+
+LIBRARY = _library_path()
+
+
+@unittest.skipUnless(LIBRARY.exists(), f"native library not built: {LIBRARY}")
+class NativeBackendTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with mock.patch.dict(os.environ, {"PASSCODE_NATIVE_LIB": str(LIBRARY)}):
+            sys.modules.pop("passcode_py._native", None)
+            cls.native = importlib.import_module("passcode_py._native")
+
+    def test_fixed_vectors(self):
+        for name, expected in EXPECTED.items():
+            with self.subTest(name):
+                passcode = self.native.Passcode(self.native.Algorithm[name], KEY)
+                self.assertEqual(passcode.compute(CHALLENGE), expected)
+                self.assertEqual(passcode.compute_bytes(CHALLENGE), expected.encode())
+                self.assertEqual(passcode.compute_many([CHALLENGE] * 3), [expected] * 3)
+
+    def test_bytes_like_inputs(self):
+        passcode = self.native.Passcode(self.native.Algorithm.SHA3_KMAC_128, KEY)
+        expected = EXPECTED["SHA3_KMAC_128"]
+        for data in (bytearray(CHALLENGE), memoryview(CHALLENGE), array.array("B", CHALLENGE)):
+            with self.subTest(type(data).__name__):
+                self.assertEqual(passcode.compute(data), expected)
+                self.assertEqual(passcode.compute_bytes(data), expected.encode())
+        self.assertEqual(passcode.compute_many([bytearray(CHALLENGE), memoryview(CHALLENGE)]), [expected] * 2)
+
+    def test_compute_many_matches_compute(self):
+        for algorithm in self.native.Algorithm:
+            with self.subTest(algorithm.name):
+                passcode = self.native.Passcode(algorithm, KEY)
+                # Includes an empty challenge and lengths across block sizes
+                challenges = [bytes(range(n % 256)) * (1 + n // 256) for n in range(0, 600, 37)]
+                self.assertEqual(passcode.compute_many(challenges), [passcode.compute(c) for c in challenges])
+                self.assertEqual(passcode.compute_many([]), [])
+
+    def test_compute_many_rejects_overflow(self):
+        passcode = self.native.Passcode(self.native.Algorithm.SHA3_KMAC_128, KEY)
+        compute_many = self.native._lib.passcode_compute_many
+        out = ctypes.create_string_buffer(24)
+        # Both are rejected before the library reads past the two lengths,
+        # the empty data or the 24-byte output buffer
+        lens = (ctypes.c_size_t * 2)(2, 3)
+        self.assertEqual(compute_many(passcode._handle, b"", lens, 1 << 31, out, 12 << 31), -2)
+        lens = (ctypes.c_size_t * 2)(ctypes.c_size_t(-1).value, 2)
+        self.assertEqual(compute_many(passcode._handle, b"", lens, 2, out, len(out)), -2)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            self.native.Passcode(self.native.Algorithm.SHA3_KMAC_128, bytearray(KEY))
+        # Out of range for the u8 passcode_new takes, not just unknown
+        for algorithm in (7, 256, -1):
+            with self.subTest(algorithm), self.assertRaises(ValueError):
+                self.native.Passcode(algorithm, KEY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Checks the Node.js bridge's sidecar protocol against a stand-in Node.js module"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ports" / "python"))
+
+from passcode_py import passcode_nodejs_bridge as bridge  # noqa: E402
+
+# Stand-in for ports/nodejs: the "OTP" echoes the algorithm, key and data so
+# responses show which registered instance answered. Empty data throws.
+FAKE_MODULE = """
+class Passcode {
+  constructor(algorithm, key) { this.prefix = algorithm + ':' + key.toString('hex') + ':'; }
+  compute(data) {
+    if (data.length === 0) throw new Error('empty challenge');
+    return this.prefix + Buffer.from(data).toString('hex');
+  }
+}
+module.exports = { Passcode };
+"""
+
+# Keeps running after stdin closes
+HUNG_MODULE = FAKE_MODULE + "setInterval(() => {}, 1000);\n"
+
+
+@unittest.skipIf(shutil.which("node") is None, "node is not installed")
+class SidecarTest(unittest.TestCase):
+    def setUp(self):
+        self.module_dir = tempfile.TemporaryDirectory()
+        self.write_module(FAKE_MODULE)
+        patcher = mock.patch.object(bridge, "_NODEJS_MODULE", Path(self.module_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.module_dir.cleanup)
+        self.addCleanup(bridge._stop_sidecar)
+
+    def write_module(self, source):
+        (Path(self.module_dir.name) / "index.js").write_text(source)
+
+    def make_passcode(self, algorithm=bridge.Algorithm.SHA3_KMAC_128, key=b"k" * 32):
+        passcode = bridge.Passcode(algorithm, key)
+        # Force the sidecar even when numba/blake3 are installed
+        passcode._local = None
+        return passcode
+
+    def test_compute_and_batch(self):
+        passcode = self.make_passcode(bridge.Algorithm.BLAKE3_KEYED_MODE_256, b"\x01\x02")
+        self.assertEqual(passcode.compute(b"\xab"), "3:0102:ab")
+        self.assertEqual(passcode.compute_bytes(bytearray(b"\xcd")), b"3:0102:cd")
+        self.assertEqual(passcode.compute_many([b"\x01", memoryview(b"\x02")]), ["3:0102:01", "3:0102:02"])
+
+    def test_registers_once_and_releases(self):
+        passcode = self.make_passcode()
+        passcode.compute(b"a")
+        ref = passcode._sidecar_ref
+        passcode.compute(b"b")
+        self.assertEqual(passcode._sidecar_ref, ref)
+
+        del passcode
+        other = self.make_passcode()
+        self.assertEqual(other.compute(b"c"), "0:" + "6b" * 32 + ":63")
+        self.assertEqual(bridge._released, [])
+
+    def test_error_keeps_pipe_in_sync(self):
+        passcode = self.make_passcode()
+        with self.assertRaisesRegex(RuntimeError, "empty challenge"):
+            passcode.compute(b"")
+        self.assertEqual(passcode.compute(b"a"), "0:" + "6b" * 32 + ":61")
+
+    def test_interrupted_exchange_restarts_sidecar(self):
+        passcode = self.make_passcode()
+        passcode.compute(b"a")
+        proc = bridge._sidecar
+
+        # Interrupt after the request is written, before the response is read
+        with mock.patch.object(bridge, "_read_exact", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                passcode.compute(b"b")
+        self.assertIsNone(bridge._sidecar)
+        self.assertIsNotNone(proc.poll())
+
+        # The key is registered again with the new sidecar
+        self.assertEqual(passcode.compute(b"c"), "0:" + "6b" * 32 + ":63")
+        self.assertIsNot(bridge._sidecar, proc)
+
+    def test_dead_sidecar_restarts(self):
+        passcode = self.make_passcode()
+        passcode.compute(b"a")
+        bridge._sidecar.kill()
+        bridge._sidecar.wait()
+        self.assertEqual(passcode.compute(b"b"), "0:" + "6b" * 32 + ":62")
+
+    def test_stop_kills_hung_sidecar(self):
+        self.write_module(HUNG_MODULE)
+        self.make_passcode().compute(b"a")
+        proc = bridge._sidecar
+        with mock.patch.object(bridge, "_STOP_TIMEOUT", 0.2):
+            bridge._stop_sidecar()
+        self.assertIsNotNone(proc.poll())
+        self.assertIsNone(bridge._sidecar)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Checks that the wasmtime backend loads the shipped module and matches the fixed vectors"""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ports" / "python"))
+
+KEY = bytes.fromhex("0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef")
+CHALLENGE = bytes.fromhex("fedcba9876543210fedcba9876543210")
+
+EXPECTED = {
+    "SHA3_KMAC_128": "2ce05573dd4e",
+    "SHA3_KMAC_256": "f391e239e588",
+    "BLAKE3_KEYED_MODE_128": "2ce4568631de",
+    "BLAKE3_KEYED_MODE_256": "2ce4568631de",
+}
+
+
+@unittest.skipIf(importlib.util.find_spec("wasmtime") is None, "wasmtime is not installed")
+class WasmBackendTest(unittest.TestCase):
+    def test_package_uses_wasmtime(self):
+        import passcode_py
+        try:
+            from passcode_py import _native  # noqa: F401
+        except (ImportError, OSError):
+            self.assertEqual(passcode_py.Passcode.__module__, "passcode_py.passcode")
+        else:
+            self.skipTest("native library is installed and takes precedence")
+
+    def test_fixed_vectors(self):
+        from passcode_py.passcode import Algorithm, Passcode
+        for name, expected in EXPECTED.items():
+            with self.subTest(name):
+                passcode = Passcode(Algorithm[name], KEY)
+                self.assertEqual(passcode.compute(CHALLENGE), expected)
+                self.assertEqual(passcode.compute_bytes(bytearray(CHALLENGE)), expected.encode())
+                self.assertEqual(passcode.compute_many([CHALLENGE, memoryview(CHALLENGE)]), [expected] * 2)
+
+    def test_large_input(self):
+        from passcode_py.passcode import Algorithm, Passcode
+        # Linear memory has to grow well past its initial size for this input
+        passcode = Passcode(Algorithm.BLAKE3_KEYED_MODE_256, bytes(32))
+        self.assertEqual(passcode.compute(b"x" * (100 << 20)), "4d17e2a30a84")
+
+    def test_unknown_algorithm(self):
+        from passcode_py.passcode import Passcode
+        with self.assertRaises(ValueError):
+            Passcode(7, KEY)
+
+    def test_shared_between_threads(self):
+        import threading
+        from passcode_py.passcode import Algorithm, Passcode
+        passcode = Passcode(Algorithm.SHA3_KMAC_128, KEY)
+        challenges = [bytes([i]) * (16 + i) for i in range(64)]
+        expected = passcode.compute_many(challenges)
+        # Created here, dropped (and freed) on the worker threads
+        spare = [[Passcode(Algorithm.BLAKE3_KEYED_MODE_256, KEY) for _ in range(20)] for _ in range(8)]
+        failures = []
+
+        def worker(owned):
+            for _ in range(20):
+                if [passcode.compute(data) for data in challenges] != expected:
+                    failures.append(threading.get_ident())
+                owned.pop()
+
+        threads = [threading.Thread(target=worker, args=(owned,)) for owned in spare]
+        del spare
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_helpers(self):
+        from passcode_py import passcode
+        # The OTP is the first 6 bytes of the digest the helpers return
+        self.assertEqual(passcode.sha3_kmac_128(KEY, b"authorization", CHALLENGE)[:12], EXPECTED["SHA3_KMAC_128"])
+        self.assertEqual(passcode.sha3_kmac_256(KEY, b"authorization", CHALLENGE)[:12], EXPECTED["SHA3_KMAC_256"])
+        self.assertEqual(len(passcode.blake3_keyed_mode_128(KEY, CHALLENGE)), 64)
+        self.assertEqual(passcode.blake3_keyed_mode_256(KEY, CHALLENGE)[:12], EXPECTED["BLAKE3_KEYED_MODE_256"])
+
+
+if __name__ == "__main__":
+    unittest.main()
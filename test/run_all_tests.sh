@@ -78,6 +78,19 @@ else
 fi
 echo ""
 
+# 6. Python backend unit tests (each skips when its backend is unavailable)
+echo "6. Running Python backend unit tests..."
+if python3 -m unittest discover -s . -p 'python_*_test.py' > python_unit_output.txt 2>&1; then
+    tail -n 3 python_unit_output.txt
+    results["Python-Unit"]="✅"
+else
+    echo -e "${RED}❌ Python unit tests failed${NC}"
+    cat python_unit_output.txt
+    results["Python-Unit"]="❌"
+    unit_tests_failed=true
+fi
+echo ""
+
 # Dart removed - implementation incomplete
 echo ""
 
@@ -124,19 +137,19 @@ else
 fi
 
 # Cleanup
-rm -f go_output.txt rust_output.txt node_output.txt nodejs_lib_output.txt python_output.txt
+rm -f go_output.txt rust_output.txt node_output.txt nodejs_lib_output.txt python_output.txt python_unit_output.txt
 rm -f go_otps.txt rust_otps.txt node_otps.txt nodejs_lib_otps.txt python_otps.txt
 
 echo ""
 echo "========================================"
 echo "Summary"
 echo "========================================"
-for impl in "Go" "Rust" "Node.js-WASM" "Node.js-Lib" "Python"; do
+for impl in "Go" "Rust" "Node.js-WASM" "Node.js-Lib" "Python" "Python-Unit"; do
     echo -e "$impl: ${results[$impl]}"
 done
 echo "========================================"
 
-if [ "$all_match" = true ]; then
+if [ "$all_match" = true ] && [ "$unit_tests_failed" != true ]; then
     exit 0
 else
     exit 1